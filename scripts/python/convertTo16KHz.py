@@ -1,8 +1,34 @@
 import os
-import subprocess
+import wave
 import argparse
 from pathlib import Path
 
+import av
+
+SAMPLE_RATE = 16000
+
+def convert_file(audio_file, output_file):
+    # Decode and resample in-process with libav instead of spawning ffmpeg per file
+    with av.open(str(audio_file)) as container:
+        if not container.streams.audio:
+            raise ValueError("no audio stream")
+        stream = container.streams.audio[0]
+        stream.thread_type = 'AUTO'
+        resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+
+        with wave.open(str(output_file), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    wav.writeframesraw(resampled.to_ndarray().tobytes())
+
+            # Flush samples buffered inside the resampler; close() patches the header once
+            for resampled in resampler.resample(None):
+                wav.writeframesraw(resampled.to_ndarray().tobytes())
+
 def convert_files(input_dir, output_dir, extension='m4a'):
     input_dir = Path(input_dir)
     output_dir = Path(output_dir)
@@ -15,8 +41,12 @@ def convert_files(input_dir, output_dir, extension='m4a'):
         # Define the output file name
         output_file = output_dir / audio_file.with_suffix('.wav').name
 
-        # Use ffmpeg to convert the audio
-        subprocess.run(['ffmpeg', '-i', str(audio_file), '-ar', '16000', str(output_file)])
+        try:
+            convert_file(audio_file, output_file)
+        except (av.error.FFmpegError, ValueError) as e:
+            # Skip unreadable files instead of aborting the whole directory
+            print(f"Failed to convert {audio_file}: {e}")
+            output_file.unlink(missing_ok=True)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Convert audio files to 16khz wav format")
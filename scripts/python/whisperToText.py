@@ -1,17 +1,30 @@
 import os
-from faster_whisper import WhisperModel
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
 
-model_size = "large-v2"
-model = WhisperModel(model_size, device="cuda", compute_type="float16")
+# 创建命令行参数解析器，输入输出目录不再写死在脚本里
+parser = argparse.ArgumentParser(description="Transcribe a directory of audio files to text")
+parser.add_argument("input_dir", help="Directory containing the input audio files")
+parser.add_argument("output_dir", help="Directory to save the transcripts")
+parser.add_argument("--extensions", nargs="+", default=["wav"], help="Audio file extensions to transcribe, e.g. wav m4a mp3")
+# int8_float16：int8 权重 + fp16 激活，显存约为 float16 的 60%，可以调大 batch_size
+parser.add_argument("--compute_type", default="int8_float16", help="CTranslate2 compute type, e.g. int8_float16 or float16")
+args = parser.parse_args()
 
-input_dir = r"G:\daymade\whisper\tiktok-whisper\data\xiaoyuzhou\output\虎言乱语"
-output_dir = r"G:\daymade\whisper\tiktok-whisper\data\xiaoyuzhou\text_output\虎言乱语"
+input_dir = args.input_dir
+output_dir = args.output_dir
+# 统一成小写带点的扩展名，按集合查找
+audio_extensions = frozenset("." + ext.lower().lstrip(".") for ext in args.extensions)
 
-def transcribe_file(file_path):
-    print(f"Start transcribing {file_path}")
-    segments, info = model.transcribe(file_path, beam_size=5, language="zh")
-    print("Detected language '%s' with probability %f" % (info.language, info.language_probability))
+model_size = "large-v2"
+# 模型缓存目录，多次运行复用同一份模型文件；未设置时使用 Hugging Face 默认缓存
+model_dir = os.environ.get("WHISPER_MODEL_DIR")
+model = WhisperModel(model_size, device="cuda", compute_type=args.compute_type, download_root=model_dir)
+# 按 VAD 把长音频切成片段后批量送入 GPU 解码
+batched_model = BatchedInferencePipeline(model=model)
 
+def transcribe_file(file_path, audio):
     output_file_path = os.path.join(output_dir, os.path.splitext(os.path.basename(file_path))[0] + '.txt')
 
     # If output file already exists, skip this file
@@ -19,20 +32,46 @@ def transcribe_file(file_path):
         print(f"Output file {output_file_path} already exists, skipping...")
         return
 
-    with open(output_file_path, 'w', encoding='utf-8') as f:
+    print(f"Start transcribing {file_path}")
+    segments, info = batched_model.transcribe(audio, batch_size=16, beam_size=5, language="zh", vad_filter=True, without_timestamps=False)
+    print("Detected language '%s' with probability %f" % (info.language, info.language_probability))
+
+    # 攒够一批再写入，减少小块写入的次数
+    with open(output_file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        lines = []
         for i, segment in enumerate(segments, 1):
-            f.write("[%.2fs -> %.2fs] %s\n" % (segment.start, segment.end, segment.text))
-            print(f"Written segment {i} out of {len(segments)}")
+            lines.append(f"[{segment.start:.2f}s -> {segment.end:.2f}s] {segment.text}\n")
+            if len(lines) >= 256:
+                f.writelines(lines)
+                lines.clear()
+            # segments 是惰性生成器，只按计数输出进度，不调用 len()
+            if i % 100 == 0:
+                print(f"Transcribed {i} segments, {round(segment.end)}s of {round(info.duration)}s")
+        f.writelines(lines)
 
 # 创建输出目录，如果不存在的话
 if not os.path.exists(output_dir):
     os.makedirs(output_dir)
 
-# 获取目录下所有wav文件
-wav_files = [os.path.join(input_dir, file) for file in os.listdir(input_dir) if file.endswith('.wav')]
+# 已有转写结果的文件名（不含扩展名），一次性列出
+with os.scandir(output_dir) as entries:
+    done = {os.path.splitext(entry.name)[0] for entry in entries if entry.name.endswith('.txt')}
+
+# 获取目录下所有还没有转写过的音频文件
+wav_files = []
+with os.scandir(input_dir) as entries:
+    for entry in entries:
+        stem, ext = os.path.splitext(entry.name)
+        if entry.is_file() and ext.lower() in audio_extensions and stem not in done:
+            wav_files.append(entry.path)
 
-# 顺序处理文件
-for i, wav_file in enumerate(wav_files, 1):
-    print(f"Start processing file {i} out of {len(wav_files)}: {wav_file}")
-    transcribe_file(wav_file)
-    print(f"Finished processing file {i} out of {len(wav_files)}: {wav_file}")
+# 顺序处理文件，转写当前文件的同时在后台线程解码下一个文件
+with ThreadPoolExecutor(max_workers=1) as prefetcher:
+    next_audio = prefetcher.submit(decode_audio, wav_files[0]) if wav_files else None
+    for i, wav_file in enumerate(wav_files, 1):
+        audio = next_audio.result()
+        if i < len(wav_files):
+            next_audio = prefetcher.submit(decode_audio, wav_files[i])
+        print(f"Start processing file {i} out of {len(wav_files)}: {wav_file}")
+        transcribe_file(wav_file, audio)
+        print(f"Finished processing file {i} out of {len(wav_files)}: {wav_file}")
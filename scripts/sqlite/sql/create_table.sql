@@ -10,4 +10,8 @@ CREATE TABLE IF NOT EXISTS transcriptions
     last_conversion_time DATETIME NOT NULL,
     has_error            INTEGER  NOT NULL,
     error_message        TEXT
-);
\ No newline at end of file
+);
+
+-- serves GetAllByUser: filter by user/has_error and read rows already ordered by last_conversion_time
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_time
+    ON transcriptions ("user", has_error, last_conversion_time DESC);
\ No newline at end of file